@@ -4,11 +4,18 @@ Aegis Agent Orchestrator - Coordinates 8 specialized AI agents.
 Uses LangGraph for multi-agent orchestration and Google Gemini for analysis.
 Each agent specializes in a specific risk dimension and outputs structured scores.
 """
+import asyncio
+import copy
+import hashlib
+import json
 import os
-from typing import Dict, List, Optional, Any
+import re
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from functools import lru_cache
 import logging
 import google.generativeai as genai
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
 
 from src.db.models import Supplier, Contract, AgentActivity, AgentType
@@ -24,13 +31,27 @@ else:
     logger.warning("GOOGLE_API_KEY not set. Agent functionality will be limited.")
 
 
+# Parsed Gemini results keyed by (agent type, prompt digest), so retries and
+# repeat assessments of unchanged supplier data skip the LLM round-trip
+_llm_result_cache: TTLCache = TTLCache(
+    maxsize=settings.AGENT_CACHE_MAX_ENTRIES,
+    ttl=settings.AGENT_CACHE_TTL_SECONDS
+)
+
+
+@lru_cache(maxsize=1)
+def get_gemini_model() -> genai.GenerativeModel:
+    """Return the shared Gemini model, created on first use and reused by all agents."""
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+
 class BaseAgent:
     """Base class for all specialized agents."""
 
     def __init__(self, agent_type: AgentType, db: Session):
         self.agent_type = agent_type
         self.db = db
-        self.model = genai.GenerativeModel("gemini-1.5-flash")
+        self.model = get_gemini_model()
 
     async def analyze(
         self,
@@ -51,13 +72,61 @@ class BaseAgent:
         """
         raise NotImplementedError("Subclasses must implement analyze()")
 
+    async def _generate_json(self, prompt: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a prompt through Gemini and parse the JSON reply, reusing cached results.
+
+        Returns:
+            The parsed result, and whether it was served from the cache
+
+        Raises:
+            json.JSONDecodeError: If the reply is not valid JSON (its doc holds the reply)
+        """
+        prompt_digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        cache_key = (self.agent_type.value, prompt_digest)
+
+        cached = _llm_result_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached), True
+
+        response = await self.model.generate_content_async(prompt)
+        try:
+            result = self._parse_gemini_response(response.text)
+        except json.JSONDecodeError:
+            # Malformed replies are not cached, so a retry asks Gemini again
+            logger.warning(f"{self.agent_type.value} agent received a non-JSON Gemini reply")
+            raise
+
+        _llm_result_cache[cache_key] = copy.deepcopy(result)
+        return result, False
+
+    @staticmethod
+    def _parse_gemini_response(text: str) -> Dict[str, Any]:
+        """Parse Gemini JSON response, unwrapping a markdown code block if present."""
+        json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
+        if json_match:
+            text = json_match.group(1)
+        return json.loads(text)
+
+    @staticmethod
+    def _unparsed_response_result(text: str) -> Dict[str, Any]:
+        """Return a neutral result carrying the start of a reply that was not JSON."""
+        return {
+            "risk_score": 50.0,
+            "confidence": 0.5,
+            "findings": [text[:500]],
+            "recommendations": [],
+            "risk_factors": {}
+        }
+
     def _log_activity(
         self,
         supplier_id: int,
         task_description: str,
         result: Dict,
         status: str = "completed",
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        cache_hit: bool = False
     ):
         """Log agent activity to database."""
         activity = AgentActivity(
@@ -67,6 +136,7 @@ class BaseAgent:
             status=status,
             result=result,
             error_message=error,
+            cache_hit=cache_hit,
             completed_at=datetime.now() if status == "completed" else None,
         )
 
@@ -119,14 +189,17 @@ Respond in JSON format:
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_gemini_response(response.text)
+            try:
+                result, cache_hit = await self._generate_json(prompt)
+            except json.JSONDecodeError as e:
+                result, cache_hit = self._unparsed_response_result(e.doc), False
 
             self._log_activity(
                 supplier_id=supplier.id,
                 task_description=f"Financial risk analysis for {supplier.name}",
                 result=result,
-                status="completed"
+                status="completed",
+                cache_hit=cache_hit
             )
 
             return result
@@ -149,28 +222,6 @@ Respond in JSON format:
                 "risk_factors": {}
             }
 
-    def _parse_gemini_response(self, text: str) -> Dict:
-        """Parse Gemini JSON response."""
-        import json
-        import re
-
-        # Extract JSON from markdown code blocks if present
-        json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
-
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Fallback parsing
-            return {
-                "risk_score": 50.0,
-                "confidence": 0.5,
-                "findings": [text[:500]],
-                "recommendations": [],
-                "risk_factors": {}
-            }
-
 
 class LegalAgent(BaseAgent):
     """Analyzes legal compliance, contract risks, and regulatory issues."""
@@ -229,14 +280,17 @@ Respond in JSON format:
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_gemini_response(response.text)
+            try:
+                result, cache_hit = await self._generate_json(prompt)
+            except json.JSONDecodeError as e:
+                result, cache_hit = self._unparsed_response_result(e.doc), False
 
             self._log_activity(
                 supplier_id=supplier.id,
                 task_description=f"Legal risk analysis for {supplier.name}",
                 result=result,
-                status="completed"
+                status="completed",
+                cache_hit=cache_hit
             )
 
             return result
@@ -245,26 +299,6 @@ Respond in JSON format:
             logger.error(f"Legal agent error: {str(e)}")
             return self._default_error_result(str(e))
 
-    def _parse_gemini_response(self, text: str) -> Dict:
-        """Parse Gemini JSON response."""
-        import json
-        import re
-
-        json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
-
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            return {
-                "risk_score": 50.0,
-                "confidence": 0.5,
-                "findings": [text[:500]],
-                "recommendations": [],
-                "risk_factors": {}
-            }
-
     def _default_error_result(self, error: str) -> Dict:
         """Return default result on error."""
         return {
@@ -320,14 +354,17 @@ Respond in JSON format:
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_gemini_response(response.text)
+            try:
+                result, cache_hit = await self._generate_json(prompt)
+            except json.JSONDecodeError as e:
+                result, cache_hit = self._unparsed_response_result(e.doc), False
 
             self._log_activity(
                 supplier_id=supplier.id,
                 task_description=f"ESG analysis for {supplier.name}",
                 result=result,
-                status="completed"
+                status="completed",
+                cache_hit=cache_hit
             )
 
             return result
@@ -342,26 +379,6 @@ Respond in JSON format:
                 "risk_factors": {}
             }
 
-    def _parse_gemini_response(self, text: str) -> Dict:
-        """Parse Gemini JSON response."""
-        import json
-        import re
-
-        json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
-
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            return {
-                "risk_score": 50.0,
-                "confidence": 0.5,
-                "findings": [text[:500]],
-                "recommendations": [],
-                "risk_factors": {}
-            }
-
 
 class GeopoliticalAgent(BaseAgent):
     """Analyzes geopolitical and climate risks."""
@@ -407,14 +424,17 @@ Respond in JSON format:
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_gemini_response(response.text)
+            try:
+                result, cache_hit = await self._generate_json(prompt)
+            except json.JSONDecodeError as e:
+                result, cache_hit = self._unparsed_response_result(e.doc), False
 
             self._log_activity(
                 supplier_id=supplier.id,
                 task_description=f"Geopolitical analysis for {supplier.name}",
                 result=result,
-                status="completed"
+                status="completed",
+                cache_hit=cache_hit
             )
 
             return result
@@ -429,23 +449,6 @@ Respond in JSON format:
                 "risk_factors": {}
             }
 
-    def _parse_gemini_response(self, text: str) -> Dict:
-        import json
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-        if json_match:
-            text = json_match.group(1)
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            return {
-                "risk_score": 50.0,
-                "confidence": 0.5,
-                "findings": [text[:500]],
-                "recommendations": [],
-                "risk_factors": {}
-            }
-
 
 # Simpler rule-based agents for remaining categories
 class OperationalAgent(BaseAgent):
@@ -684,13 +687,48 @@ class AegisOrchestrator:
         if contract_id:
             contract = self.db.query(Contract).filter(Contract.id == contract_id).first()
 
-        # Run all agents in parallel (in real implementation, use asyncio.gather)
+        # Run all agents concurrently, bounded by the configured concurrency and timeout
+        semaphore = asyncio.Semaphore(settings.AGENT_CONCURRENCY)
+
+        async def run_agent(agent: BaseAgent) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        agent.analyze(supplier, contract),
+                        timeout=settings.AGENT_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # The cancelled agent never reaches its own error handling,
+                    # so record the failure here
+                    error = f"Analysis timed out after {settings.AGENT_TIMEOUT_SECONDS}s"
+                    logger.error(f"{agent.agent_type.value} agent error: {error}")
+                    agent._log_activity(
+                        supplier_id=supplier.id,
+                        task_description=f"{agent.agent_type.value} risk analysis for {supplier.name}",
+                        result={},
+                        status="failed",
+                        error=error
+                    )
+                    return {
+                        "risk_score": 50.0,
+                        "confidence": 0.3,
+                        "findings": [error],
+                        "recommendations": ["Retry the assessment or conduct a manual review"],
+                        "risk_factors": {}
+                    }
+
+        analyses = await asyncio.gather(
+            *(run_agent(agent) for agent in self.agents.values()),
+            return_exceptions=True
+        )
+
         results = {}
         category_scores = {}
 
-        for agent_name, agent in self.agents.items():
+        for agent_name, analysis in zip(self.agents, analyses):
             try:
-                analysis = await agent.analyze(supplier, contract)
+                if isinstance(analysis, BaseException):
+                    raise analysis
                 results[agent_name] = analysis
                 category_scores[f"{agent_name}_score"] = analysis["risk_score"]
             except Exception as e:
@@ -710,7 +748,8 @@ class AegisOrchestrator:
             category_scores=category_scores,
             contract_id=contract_id,
             confidence_level=sum(r.get("confidence", 0.5) for r in results.values()) / len(results),
-            risk_factors=results
+            risk_factors=results,
+            supplier=supplier
         )
 
         return {
@@ -108,6 +108,7 @@ async def get_agent_activity(
             "duration_seconds": activity.duration_seconds,
             "result": activity.result,
             "error_message": activity.error_message,
+            "cache_hit": activity.cache_hit,
         }
         for activity in activities
     ]
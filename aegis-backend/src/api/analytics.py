@@ -1,6 +1,7 @@
 """
 Analytics API endpoints - Portfolio statistics, trends, and KPIs.
 """
+from bisect import bisect_left
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
@@ -345,8 +346,9 @@ async def get_esg_compliance(db: Session = Depends(get_db)):
         .subquery()
     )
 
-    assessments = (
-        db.query(RiskAssessment)
+    # Only the ESG score is needed, so fetch it as a plain column
+    esg_rows = (
+        db.query(RiskAssessment.esg_score)
         .join(
             latest_assessments_subquery,
             and_(
@@ -357,7 +359,7 @@ async def get_esg_compliance(db: Session = Depends(get_db)):
         .all()
     )
 
-    if not assessments:
+    if not esg_rows:
         return {
             "total_suppliers": 0,
             "average_esg_score": 0,
@@ -369,14 +371,19 @@ async def get_esg_compliance(db: Session = Depends(get_db)):
             }
         }
 
-    esg_scores = [a.esg_score for a in assessments]
+    esg_scores = sorted(esg_score for (esg_score,) in esg_rows)
     avg_esg = sum(esg_scores) / len(esg_scores)
 
-    # Categorize compliance levels (inverted - lower score = better)
-    excellent = len([s for s in esg_scores if s < 20])
-    good = len([s for s in esg_scores if 20 <= s < 40])
-    moderate = len([s for s in esg_scores if 40 <= s < 60])
-    poor = len([s for s in esg_scores if s >= 60])
+    # Categorize compliance levels (inverted - lower score = better); on the
+    # sorted scores each cut-off is one binary search instead of a full scan
+    below_20 = bisect_left(esg_scores, 20)
+    below_40 = bisect_left(esg_scores, 40)
+    below_60 = bisect_left(esg_scores, 60)
+
+    excellent = below_20
+    good = below_40 - below_20
+    moderate = below_60 - below_40
+    poor = len(esg_scores) - below_60
 
     return {
         "total_suppliers": len(esg_scores),
@@ -15,9 +15,10 @@ from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from src.db.database import get_db
+from src.db.database import get_db, get_db_context
 from src.db.models import RiskMatrixVersion
 from src.services.ml_training_service import MLTrainingService
+from src.services.risk_scoring_service import RiskScoringService
 
 router = APIRouter(prefix="/api/ml-models", tags=["ml-models"])
 
@@ -262,26 +263,47 @@ async def approve_version(version_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail=str(e))
 
 
+def _rescore_assessments_job():
+    """Rescore stored assessments with the active weights, in a session of its own."""
+    with get_db_context() as db:
+        RiskScoringService(db).rescore_assessments()
+
+
 @router.post("/versions/{version_id}/activate")
-async def activate_version(version_id: int, db: Session = Depends(get_db)):
+async def activate_version(
+    version_id: int,
+    background_tasks: BackgroundTasks,
+    rescore: bool = Query(False, description="Recompute stored assessment scores with the new weights"),
+    db: Session = Depends(get_db)
+):
     """
     Activate a risk matrix version (make it the current version).
 
     **Important:** This immediately changes how risk scores are calculated!
 
     The activated version's weights will be used for all new risk assessments.
-    Deactivates all other versions automatically.
+    Deactivates all other versions automatically. With `rescore=true`, all
+    stored assessments are also rescored with the new weights (overwriting
+    their historical scores and version).
+
+    The rescore runs in the background after the response is sent, one
+    committed batch at a time. Until it finishes (or if it fails partway),
+    stored scores mix old and new weights; activating again with
+    `rescore=true` is safe and rescores everything with the active weights.
     """
     ml_service = MLTrainingService(db)
 
     try:
         activated_version = ml_service.activate_version(version_id)
+        if rescore:
+            background_tasks.add_task(_rescore_assessments_job)
 
         return {
             "status": "success",
             "message": f"Version {activated_version.version} is now active",
             "version_id": activated_version.id,
             "version": activated_version.version,
+            "rescore_scheduled": rescore,
             "weights": {
                 "financial": activated_version.financial_weight,
                 "legal": activated_version.legal_weight,
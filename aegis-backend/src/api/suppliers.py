@@ -10,7 +10,7 @@ from pydantic import BaseModel
 
 from src.db.database import get_db
 from src.db.models import Supplier, RiskAssessment, SupplierStatus
-from src.services.risk_scoring_service import RiskScoringService
+from src.services.risk_scoring_service import RiskScoringService, TrendBucket
 from src.agents.orchestrator import AegisOrchestrator
 
 router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
@@ -324,21 +324,30 @@ async def get_risk_breakdown(supplier_id: int, db: Session = Depends(get_db)):
 async def get_risk_trend(
     supplier_id: int,
     days: int = Query(90, ge=1, le=365),
+    bucket: Optional[TrendBucket] = Query(
+        None,
+        description="Average scores per period instead of returning every assessment"
+    ),
     db: Session = Depends(get_db)
 ):
-    """Get risk score trend over time for a supplier."""
+    """
+    Get risk score trend over time for a supplier.
+
+    Period bucketing is computed with date_trunc and requires PostgreSQL.
+    """
     supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
 
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
 
     risk_service = RiskScoringService(db)
-    trend = risk_service.get_risk_trend(supplier_id, days=days)
+    trend = risk_service.get_risk_trend(supplier_id, days=days, bucket=bucket)
 
     return {
         "supplier_id": supplier_id,
         "supplier_name": supplier.name,
         "period_days": days,
+        "bucket": bucket,
         "data_points": len(trend),
         "trend": trend
     }
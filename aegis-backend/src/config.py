@@ -19,6 +19,10 @@ class Settings(BaseSettings):
     )
     DATABASE_POOL_SIZE: int = Field(default=20, description="Database connection pool size")
     DATABASE_MAX_OVERFLOW: int = Field(default=40, description="Max overflow connections")
+    DATABASE_INSERT_PAGE_SIZE: int = Field(
+        default=1000,
+        description="Rows per INSERT statement when executing bulk inserts"
+    )
 
     # Redis Configuration
     REDIS_URL: str = Field(default="redis://localhost:6379/0", description="Redis connection URL")
@@ -74,6 +78,8 @@ class Settings(BaseSettings):
     AGENT_MAX_RETRIES: int = Field(default=3, description="Maximum retries for agent tasks")
     AGENT_TIMEOUT_SECONDS: int = Field(default=30, description="Agent task timeout in seconds")
     AGENT_CONCURRENCY: int = Field(default=5, description="Maximum concurrent agent tasks")
+    AGENT_CACHE_TTL_SECONDS: int = Field(default=900, description="How long cached LLM agent results stay valid")
+    AGENT_CACHE_MAX_ENTRIES: int = Field(default=1024, description="Maximum cached LLM agent results")
 
     # Logging
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
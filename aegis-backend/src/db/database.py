@@ -1,7 +1,7 @@
 """
 Database connection and session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
@@ -17,6 +17,7 @@ engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    insertmanyvalues_page_size=settings.DATABASE_INSERT_PAGE_SIZE,  # Bound bulk INSERT size
     pool_pre_ping=True,  # Test connections before using
     echo=settings.DEBUG,  # Log SQL queries in debug mode
 )
@@ -58,6 +59,27 @@ def get_db_context():
         db.close()
 
 
+@contextmanager
+def count_queries(bind=None):
+    """
+    Context manager that records every SQL statement sent to the database.
+    Use in development to catch N+1 and per-row insert regressions.
+
+    Yields the list of statements, which fills up as the block runs.
+    """
+    bind = bind if bind is not None else engine
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", _before_cursor_execute)
+
+
 def init_db():
     """Initialize database by creating all tables."""
     from src.db import models  # Import models to register them
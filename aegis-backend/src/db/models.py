@@ -4,7 +4,7 @@ Defines all database tables and relationships.
 """
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime, Text, JSON,
-    ForeignKey, Enum as SQLEnum, UniqueConstraint, Index
+    ForeignKey, Enum as SQLEnum, UniqueConstraint, Index, Computed
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -212,8 +212,17 @@ class RiskAssessment(Base):
     assessed_by_agent = Column(Boolean, default=True)
     agent_type = Column(SQLEnum(AgentType), nullable=True)
 
-    # Recommendations
-    recommendation = Column(String(50))  # "Proceed", "Negotiate", "Replace"
+    # Recommendations (derived from composite_score by the database)
+    recommendation = Column(
+        String(50),
+        Computed(
+            "CASE WHEN composite_score < 40 THEN 'Proceed' "
+            "WHEN composite_score < 70 THEN 'Negotiate' "
+            "ELSE 'Replace' END",
+            persisted=True,
+        ),
+        index=True,
+    )  # "Proceed", "Negotiate", "Replace"
     recommendation_rationale = Column(Text)
 
     # Additional analysis
@@ -227,7 +236,8 @@ class RiskAssessment(Base):
 
     # Indexes
     __table_args__ = (
-        Index('idx_assessment_supplier_date', 'supplier_id', 'assessed_at'),
+        # Newest-first per supplier: "latest assessment" lookups are a single index seek
+        Index('idx_assessment_supplier_date', supplier_id, assessed_at.desc()),
         Index('idx_assessment_composite_score', 'composite_score'),
     )
 
@@ -337,6 +347,7 @@ class AgentActivity(Base):
     # Results
     result = Column(JSON)  # Agent output/findings
     error_message = Column(Text)
+    cache_hit = Column(Boolean, default=False, nullable=False)  # Result reused from the agent cache, no Gemini call
 
     # Metadata
     metadata = Column(JSON)
@@ -9,10 +9,15 @@ This application provides:
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
+from sqlalchemy import text
+import asyncio
 import logging
-import sys
+import logging.config
+import time
+import orjson
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,15 +27,41 @@ from src.config import settings
 from src.db.database import init_db, engine
 from src.api import suppliers, agents, alerts, analytics, ml_models
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout
-)
+# Configure logging (JSON lines for log shippers, or plain text via LOG_FORMAT=text)
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {
+            "()": "pythonjsonlogger.json.JsonFormatter",
+            "fmt": "%(asctime)s %(name)s %(levelname)s %(message)s",
+        },
+        "text": {
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "json" if settings.LOG_FORMAT == "json" else "text",
+        },
+    },
+    "root": {
+        "level": settings.LOG_LEVEL,
+        "handlers": ["console"],
+    },
+})
 
 logger = logging.getLogger(__name__)
 
+# A healthy database is re-checked at most once per TTL so bursts of probes
+# share a single query; failures are never cached, so recovery shows at once.
+# The monotonic time of the last successful probe is a single float, replaced
+# atomically, so threadpool workers can share it without a lock.
+HEALTH_CHECK_TTL_SECONDS = 1.0
+_db_healthy_at: Optional[float] = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,7 +69,8 @@ async def lifespan(app: FastAPI):
     Application lifespan events.
 
     Startup:
-    - Initialize database tables
+    - Initialize database tables (non-production only; production schemas
+      are managed out-of-band, e.g. with Alembic migrations)
     - Log application startup
 
     Shutdown:
@@ -46,19 +78,17 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("=" * 60)
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("Environment: %s", settings.ENVIRONMENT)
     logger.info("=" * 60)
 
-    # Initialize database
-    try:
+    # Initialize database in a worker thread so the remaining startup checks overlap it
+    init_db_task = None
+    if settings.ENVIRONMENT != "production":
         logger.info("Initializing database...")
-        init_db()
-        logger.info("✓ Database initialized successfully")
-    except Exception as e:
-        logger.error(f"✗ Database initialization failed: {str(e)}")
-        if settings.ENVIRONMENT == "production":
-            raise
+        init_db_task = asyncio.get_running_loop().run_in_executor(None, init_db)
+    else:
+        logger.info("Skipping table creation in production - run migrations out-of-band")
 
     # Check Gemini API key
     if settings.GOOGLE_API_KEY:
@@ -66,9 +96,16 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("⚠ GOOGLE_API_KEY not set - AI agents will have limited functionality")
 
+    if init_db_task is not None:
+        try:
+            await init_db_task
+            logger.info("✓ Database initialized successfully")
+        except Exception as e:
+            logger.error("✗ Database initialization failed: %s", e)
+
     logger.info("=" * 60)
     logger.info("🚀 Application ready!")
-    logger.info(f"📊 API Documentation: http://localhost:8000/docs")
+    logger.info("📊 API Documentation: http://localhost:8000/docs")
     logger.info("=" * 60)
 
     yield
@@ -85,6 +122,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="AI-Powered Supply Chain Risk Management Platform with Adaptive Learning",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -104,9 +142,9 @@ app.add_middleware(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions gracefully."""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
@@ -125,46 +163,64 @@ app.include_router(ml_models.router)
 logger.info("✓ All API routers registered")
 
 
+# Settings are fixed for the life of the process, so static response bodies
+# are serialized once at import; immutable bytes cannot be changed by a handler
+_ROOT_BODY = orjson.dumps({
+    "message": "Aegis Backend is running 🚀",
+    "app": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "environment": settings.ENVIRONMENT,
+    "features": {
+        "suppliers": "CRUD, filtering, risk assessment",
+        "agents": "8 specialized AI agents (Financial, Legal, ESG, Geo, Operational, Pricing, Social, Performance)",
+        "ml_learning": "Adaptive risk weight learning from contract outcomes",
+        "analytics": "Portfolio statistics, trends, regional analysis",
+        "alerts": "Real-time risk notifications"
+    },
+    "documentation": {
+        "swagger": "/docs",
+        "redoc": "/redoc"
+    }
+})
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
     """
     Root endpoint - API health check.
     """
-    return {
-        "message": "Aegis Backend is running 🚀",
-        "app": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT,
-        "features": {
-            "suppliers": "CRUD, filtering, risk assessment",
-            "agents": "8 specialized AI agents (Financial, Legal, ESG, Geo, Operational, Pricing, Social, Performance)",
-            "ml_learning": "Adaptive risk weight learning from contract outcomes",
-            "analytics": "Portfolio statistics, trends, regional analysis",
-            "alerts": "Real-time risk notifications"
-        },
-        "documentation": {
-            "swagger": "/docs",
-            "redoc": "/redoc"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+def _check_database() -> str:
+    """Ping the database over a pooled connection, caching a healthy result briefly."""
+    global _db_healthy_at
+
+    now = time.monotonic()
+    healthy_at = _db_healthy_at
+    if healthy_at is not None and now - healthy_at < HEALTH_CHECK_TTL_SECONDS:
+        return "healthy"
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error("Database health check failed: %s", e)
+        _db_healthy_at = None
+        return "unhealthy"
+
+    _db_healthy_at = now
+    return "healthy"
 
 
 @app.get("/health", tags=["Root"])
-async def health_check():
+def health_check():
     """
     Health check endpoint for monitoring.
     """
     # Check database connection
-    try:
-        from src.db.database import SessionLocal
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
-        db_status = "healthy"
-    except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
-        db_status = "unhealthy"
+    db_status = _check_database()
 
     return {
         "status": "ok" if db_status == "healthy" else "degraded",
@@ -174,34 +230,37 @@ async def health_check():
     }
 
 
+_INFO_BODY = orjson.dumps({
+    "app_name": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "environment": settings.ENVIRONMENT,
+    "debug_mode": settings.DEBUG,
+    "features": {
+        "adaptive_ml": True,
+        "ai_agents": 8,
+        "risk_categories": 8,
+        "real_time_monitoring": True,
+    },
+    "ml_config": {
+        "retrain_schedule": settings.ML_MODEL_RETRAIN_SCHEDULE,
+        "min_samples": settings.ML_MODEL_MIN_SAMPLES,
+        "validation_split": settings.ML_MODEL_VALIDATION_SPLIT,
+        "auto_approve": settings.RISK_MATRIX_AUTO_APPROVE,
+    },
+    "agent_config": {
+        "max_retries": settings.AGENT_MAX_RETRIES,
+        "timeout_seconds": settings.AGENT_TIMEOUT_SECONDS,
+        "concurrency": settings.AGENT_CONCURRENCY,
+    }
+})
+
+
 @app.get("/info", tags=["Root"])
 async def info():
     """
     Get application information and configuration.
     """
-    return {
-        "app_name": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT,
-        "debug_mode": settings.DEBUG,
-        "features": {
-            "adaptive_ml": True,
-            "ai_agents": 8,
-            "risk_categories": 8,
-            "real_time_monitoring": True,
-        },
-        "ml_config": {
-            "retrain_schedule": settings.ML_MODEL_RETRAIN_SCHEDULE,
-            "min_samples": settings.ML_MODEL_MIN_SAMPLES,
-            "validation_split": settings.ML_MODEL_VALIDATION_SPLIT,
-            "auto_approve": settings.RISK_MATRIX_AUTO_APPROVE,
-        },
-        "agent_config": {
-            "max_retries": settings.AGENT_MAX_RETRIES,
-            "timeout_seconds": settings.AGENT_TIMEOUT_SECONDS,
-            "concurrency": settings.AGENT_CONCURRENCY,
-        }
-    }
+    return Response(content=_INFO_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -6,23 +6,26 @@ from actual contract outcomes to replace static Excel-based risk matrices.
 """
 import numpy as np
 import pandas as pd
+from sklearn import config_context
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, cross_validate
 from sklearn.metrics import (
     accuracy_score, roc_auc_score, classification_report,
     confusion_matrix, precision_recall_curve
 )
 from sklearn.preprocessing import StandardScaler
 import joblib
+from joblib import Parallel, delayed
 import json
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import logging
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, case, func, select
 
 from src.db.models import (
     Contract, RiskAssessment, RiskMatrixVersion,
@@ -33,6 +36,96 @@ from src.config import settings
 logger = logging.getLogger(__name__)
 
 
+def _build_model(model_type: str, n_jobs: int = -1):
+    """Create an unfitted estimator for the given model type."""
+    if model_type == "logistic_regression":
+        # Few features and many samples: Newton steps on the small Hessian
+        # converge in a handful of iterations without line search
+        # (newton-cholesky needs scikit-learn >= 1.2)
+        return LogisticRegression(
+            solver="newton-cholesky",
+            max_iter=50,
+            random_state=42,
+            class_weight="balanced"  # Handle imbalanced data
+        )
+    if model_type == "random_forest":
+        return RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42,
+            class_weight="balanced",
+            n_jobs=n_jobs
+        )
+    if model_type == "gradient_boosting":
+        return GradientBoostingClassifier(
+            n_estimators=100,
+            max_depth=5,
+            random_state=42
+        )
+    raise ValueError(f"Unsupported model type: {model_type}")
+
+
+def _fit_model(
+    model_type: str,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    n_jobs: int = -1
+) -> Dict:
+    """
+    Fit, evaluate and cross-validate one model on pre-scaled data.
+
+    Defined at module level so it can run in joblib worker processes.
+
+    Args:
+        model_type: Type of model to train
+        X_train, y_train: Scaled training features and targets
+        X_test, y_test: Scaled hold-out features and targets
+        n_jobs: Parallelism for the estimator and cross-validation
+
+    Returns:
+        Dictionary with the fitted model, hold-out predictions and scores
+    """
+    model = _build_model(model_type, n_jobs)
+
+    # The scaled score matrix is dense and finite, so skip sklearn's
+    # per-call input and parameter validation (skip_parameter_validation
+    # needs scikit-learn >= 1.3)
+    with config_context(assume_finite=True, skip_parameter_validation=True):
+        # Cross-validation (fits its own clones, so run it before the final fit)
+        cv_results = cross_validate(
+            model, X_train, y_train,
+            cv=5,
+            scoring=("roc_auc", "accuracy"),
+            n_jobs=n_jobs
+        )
+        cv_scores = cv_results["test_roc_auc"]
+        logger.info(f"Cross-validation AUC: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+
+        # Train the final model once on the full training split
+        logger.info(f"Training {model_type} model...")
+        model.fit(X_train, y_train)
+
+        # Evaluate
+        y_pred = model.predict(X_test)
+        y_pred_proba = model.predict_proba(X_test)[:, 1]
+
+        accuracy = accuracy_score(y_test, y_pred)
+        auc = roc_auc_score(y_test, y_pred_proba)
+
+        logger.info(f"Model performance - Accuracy: {accuracy:.3f}, AUC: {auc:.3f}")
+
+    return {
+        "model": model,
+        "y_pred": y_pred,
+        "accuracy": float(accuracy),
+        "auc": float(auc),
+        "cv_scores": cv_scores,
+        "cv_accuracy": cv_results["test_accuracy"],
+    }
+
+
 class MLTrainingService:
     """
     Adaptive machine learning service for risk weight optimization.
@@ -48,84 +141,90 @@ class MLTrainingService:
         "operational", "pricing", "social", "performance"
     ]
 
+    # Feature columns, fixed in RISK_CATEGORIES order
+    SCORE_COLUMNS = tuple(f"{cat}_score" for cat in RISK_CATEGORIES)
+
+    # Contract outcomes counted as bad (what we want to predict/avoid)
+    BAD_OUTCOMES = frozenset({
+        ContractOutcome.TERMINATED_EARLY,
+        ContractOutcome.DISPUTE,
+        ContractOutcome.CLAIM,
+        ContractOutcome.PENALTY
+    })
+
+    # Reads a version's weights in RISK_CATEGORIES order
+    _weights_of = staticmethod(attrgetter(*(f"{cat}_weight" for cat in RISK_CATEGORIES)))
+
+    # Supported candidate models
+    MODEL_TYPES = ("logistic_regression", "random_forest", "gradient_boosting")
+
     def __init__(self, db: Session):
         self.db = db
-        self.scaler = StandardScaler()
 
-    def prepare_training_data(self) -> Tuple[pd.DataFrame, pd.Series, List[Dict]]:
+    def prepare_training_data(self) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
         """
         Prepare training dataset from contracts with outcomes.
 
         Returns:
-            X: Feature DataFrame (risk scores)
-            y: Target Series (binary: bad outcome or not)
+            X: Feature matrix of risk scores, float32 of shape (n_samples, 8)
+            y: Target vector, int8 (binary: bad outcome or not)
             metadata: List of contract metadata for analysis
         """
         logger.info("Preparing training data from contract outcomes...")
 
-        # Query contracts with outcomes and their risk assessments
-        contracts_with_outcomes = (
-            self.db.query(Contract, RiskAssessment)
+        # The bad-outcome label is computed by the database so it arrives with each row
+        target = case(
+            (Contract.outcome.in_(tuple(self.BAD_OUTCOMES)), 1), else_=0
+        ).label("target")
+        score_columns = [getattr(RiskAssessment, name) for name in self.SCORE_COLUMNS]
+
+        # Read contracts with outcomes and their fully scored risk assessments
+        # with a Core select straight into a DataFrame (no ORM entities)
+        stmt = (
+            select(
+                Contract.id.label("contract_id"),
+                Contract.contract_number,
+                Contract.supplier_id,
+                Contract.outcome,
+                Contract.loss_amount,
+                Contract.signed_date,
+                *score_columns,
+                target,
+            )
             .join(RiskAssessment, Contract.id == RiskAssessment.contract_id)
-            .filter(Contract.outcome.isnot(None))
-            .all()
+            .where(
+                Contract.outcome.isnot(None),
+                *(column.isnot(None) for column in score_columns),
+            )
+        )
+        # read_sql_query's dtype argument needs pandas >= 2.0
+        df = pd.read_sql_query(
+            stmt,
+            self.db.connection(),
+            dtype=dict.fromkeys(self.SCORE_COLUMNS, np.float32),
         )
 
-        if not contracts_with_outcomes:
+        if df.empty:
             raise ValueError("No contracts with outcomes found for training")
 
-        # Build dataset
-        data = []
-        metadata = []
-
-        for contract, assessment in contracts_with_outcomes:
-            # Create feature vector from risk scores
-            features = {
-                "financial_score": assessment.financial_score,
-                "legal_score": assessment.legal_score,
-                "esg_score": assessment.esg_score,
-                "geopolitical_score": assessment.geopolitical_score,
-                "operational_score": assessment.operational_score,
-                "pricing_score": assessment.pricing_score,
-                "social_score": assessment.social_score,
-                "performance_score": assessment.performance_score,
-            }
-
-            # Define bad outcomes (what we want to predict/avoid)
-            bad_outcomes = [
-                ContractOutcome.TERMINATED_EARLY,
-                ContractOutcome.DISPUTE,
-                ContractOutcome.CLAIM,
-                ContractOutcome.PENALTY
-            ]
-            is_bad_outcome = 1 if contract.outcome in bad_outcomes else 0
-
-            # Add target
-            features["target"] = is_bad_outcome
-
-            # Add contextual features (optional, can improve model)
-            features["contract_value"] = contract.contract_value or 0
-            features["loss_amount"] = contract.loss_amount or 0
-
-            data.append(features)
-
-            # Store metadata for analysis
-            metadata.append({
-                "contract_id": contract.id,
-                "contract_number": contract.contract_number,
-                "supplier_id": contract.supplier_id,
-                "outcome": contract.outcome.value,
-                "loss_amount": contract.loss_amount,
-                "signed_date": contract.signed_date.isoformat() if contract.signed_date else None,
-            })
+        # Store metadata for analysis
+        meta = df[[
+            "contract_id", "contract_number", "supplier_id",
+            "outcome", "loss_amount", "signed_date",
+        ]].astype(object)
+        meta["outcome"] = meta["outcome"].map(attrgetter("value"))
+        meta["signed_date"] = meta["signed_date"].map(lambda d: d.isoformat(), na_action="ignore")
+        metadata = meta.where(meta.notna(), None).to_dict("records")
 
-        df = pd.DataFrame(data)
         logger.info(f"Prepared {len(df)} samples for training")
         logger.info(f"Outcome distribution: {df['target'].value_counts().to_dict()}")
 
-        # Separate features and target
-        X = df[[f"{cat}_score" for cat in self.RISK_CATEGORIES]]
-        y = df["target"]
+        # Separate features and target, filling a preallocated row-major
+        # matrix column by column
+        X = np.empty((len(df), len(self.SCORE_COLUMNS)), dtype=np.float32)
+        for i, name in enumerate(self.SCORE_COLUMNS):
+            X[:, i] = df[name].to_numpy()
+        y = df["target"].to_numpy(dtype=np.int8)
 
         return X, y, metadata
 
@@ -144,10 +243,55 @@ class MLTrainingService:
         Returns:
             Dictionary with training results and metrics
         """
-        min_samples = min_samples or settings.ML_MODEL_MIN_SAMPLES
+        if model_type not in self.MODEL_TYPES:
+            raise ValueError(f"Unsupported model type: {model_type}")
 
         logger.info(f"Starting model training with {model_type}...")
 
+        split, scaler = self._prepare_split(min_samples)
+        fit = _fit_model(model_type, *split)
+
+        return self._save_model(model_type, fit, scaler, split)
+
+    def train_all_models(self, min_samples: int = None) -> Dict[str, Dict]:
+        """
+        Train every supported model type in parallel on the same data split.
+
+        Args:
+            min_samples: Minimum number of samples required (default from settings)
+
+        Returns:
+            Dictionary mapping model type to its training results
+        """
+        logger.info(f"Starting parallel training of {', '.join(self.MODEL_TYPES)}...")
+
+        split, scaler = self._prepare_split(min_samples)
+
+        # One process per model; each model fits single-threaded so the
+        # workers don't oversubscribe the cores. loky memmaps large arrays
+        # instead of pickling the training data for every worker.
+        fits = Parallel(n_jobs=len(self.MODEL_TYPES), backend="loky")(
+            delayed(_fit_model)(model_type, *split, n_jobs=1)
+            for model_type in self.MODEL_TYPES
+        )
+
+        return {
+            model_type: self._save_model(model_type, fit, scaler, split)
+            for model_type, fit in zip(self.MODEL_TYPES, fits)
+        }
+
+    def _prepare_split(
+        self,
+        min_samples: Optional[int] = None
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], StandardScaler]:
+        """
+        Load training data, split it and scale the features.
+
+        Returns:
+            (X_train_scaled, y_train, X_test_scaled, y_test) and the fitted scaler
+        """
+        min_samples = min_samples or settings.ML_MODEL_MIN_SAMPLES
+
         # Prepare data
         X, y, metadata = self.prepare_training_data()
 
@@ -165,49 +309,26 @@ class MLTrainingService:
             stratify=y  # Maintain class balance
         )
 
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale features (a fresh scaler per training run, saved with its model)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
 
-        # Select and train model
-        if model_type == "logistic_regression":
-            model = LogisticRegression(
-                max_iter=1000,
-                random_state=42,
-                class_weight="balanced"  # Handle imbalanced data
-            )
-        elif model_type == "random_forest":
-            model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                class_weight="balanced"
-            )
-        elif model_type == "gradient_boosting":
-            model = GradientBoostingClassifier(
-                n_estimators=100,
-                max_depth=5,
-                random_state=42
-            )
-        else:
-            raise ValueError(f"Unsupported model type: {model_type}")
-
-        # Train
-        logger.info("Training model...")
-        model.fit(X_train_scaled, y_train)
-
-        # Evaluate
-        y_pred = model.predict(X_test_scaled)
-        y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
+        return (X_train_scaled, y_train, X_test_scaled, y_test), scaler
 
-        accuracy = accuracy_score(y_test, y_pred)
-        auc = roc_auc_score(y_test, y_pred_proba)
-
-        logger.info(f"Model performance - Accuracy: {accuracy:.3f}, AUC: {auc:.3f}")
-
-        # Cross-validation
-        cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring="roc_auc")
-        logger.info(f"Cross-validation AUC: {cv_scores.mean():.3f} (+/- {cv_scores.std():.3f})")
+    def _save_model(
+        self,
+        model_type: str,
+        fit: Dict,
+        scaler: StandardScaler,
+        split: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    ) -> Dict:
+        """Derive risk weights from a fitted model, save it and summarize the run."""
+        model = fit["model"]
+        _, y_train, _, y_test = split
+        n_train, n_test = len(y_train), len(y_test)
+        y_pred = fit["y_pred"]
+        cv_scores = fit["cv_scores"]
 
         # Extract feature importance
         if hasattr(model, "coef_"):
@@ -219,35 +340,18 @@ class MLTrainingService:
         else:
             raise ValueError("Model does not support feature importance extraction")
 
-        # Normalize to sum to 1 (convert to weights)
-        feature_importance_normalized = feature_importance / feature_importance.sum()
-
-        # Create feature importance dictionary
-        feature_importance_dict = {
-            cat: float(imp)
-            for cat, imp in zip(self.RISK_CATEGORIES, feature_importance_normalized)
-        }
-
-        # Filter out very low importance features
-        threshold = settings.ML_FEATURE_IMPORTANCE_THRESHOLD
-        feature_importance_filtered = {
-            k: v for k, v in feature_importance_dict.items()
-            if v >= threshold
-        }
-
-        # Renormalize after filtering
-        total_filtered = sum(feature_importance_filtered.values())
-        feature_importance_final = {
-            k: v / total_filtered
-            for k, v in feature_importance_filtered.items()
-        }
+        # Normalize to sum to 1 (convert to weights), zero out very low
+        # importance features and renormalize the rest
+        importance = np.asarray(feature_importance, dtype=np.float64)
+        importance = importance / importance.sum()
+        importance[importance < settings.ML_FEATURE_IMPORTANCE_THRESHOLD] = 0.0
+        total_filtered = importance.sum()
+        if total_filtered > 0:
+            importance /= total_filtered
 
-        # Add back filtered features with zero weight
-        for cat in self.RISK_CATEGORIES:
-            if cat not in feature_importance_final:
-                feature_importance_final[cat] = 0.0
+        feature_importance_final = dict(zip(self.RISK_CATEGORIES, importance.tolist()))
 
-        logger.info("Feature importance (new weights):")
+        logger.info(f"Feature importance (new weights) for {model_type}:")
         for cat, weight in sorted(feature_importance_final.items(), key=lambda x: x[1], reverse=True):
             logger.info(f"  {cat}: {weight:.4f}")
 
@@ -258,16 +362,16 @@ class MLTrainingService:
 
         joblib.dump({
             "model": model,
-            "scaler": self.scaler,
+            "scaler": scaler,
             "feature_names": self.RISK_CATEGORIES,
             "metadata": {
                 "model_type": model_type,
                 "trained_at": timestamp,
-                "n_samples": len(X),
-                "n_train": len(X_train),
-                "n_test": len(X_test),
+                "n_samples": n_train + n_test,
+                "n_train": n_train,
+                "n_test": n_test,
             }
-        }, model_path)
+        }, model_path, compress=("zlib", 3))  # Smaller files, faster cold-start loads
 
         logger.info(f"Model saved to {model_path}")
 
@@ -275,13 +379,14 @@ class MLTrainingService:
         return {
             "model_type": model_type,
             "model_path": str(model_path),
-            "n_samples": len(X),
-            "n_train": len(X_train),
-            "n_test": len(X_test),
-            "accuracy": float(accuracy),
-            "auc": float(auc),
+            "n_samples": n_train + n_test,
+            "n_train": n_train,
+            "n_test": n_test,
+            "accuracy": fit["accuracy"],
+            "auc": fit["auc"],
             "cv_auc_mean": float(cv_scores.mean()),
             "cv_auc_std": float(cv_scores.std()),
+            "cv_accuracy_mean": float(fit["cv_accuracy"].mean()),
             "feature_importance": feature_importance_final,
             "confusion_matrix": confusion_matrix(y_test, y_pred).tolist(),
             "classification_report": classification_report(y_test, y_pred, output_dict=True),
@@ -405,8 +510,11 @@ class MLTrainingService:
                 "Approve it first using approve_version()."
             )
 
-        # Deactivate all other versions
-        self.db.query(RiskMatrixVersion).update({"is_active": False})
+        # Deactivate all other versions (only rows that are currently active)
+        self.db.query(RiskMatrixVersion).filter(
+            RiskMatrixVersion.is_active == True,
+            RiskMatrixVersion.id != version_id
+        ).update({"is_active": False}, synchronize_session=False)
 
         # Activate this version
         version.is_active = True
@@ -445,27 +553,28 @@ class MLTrainingService:
         Returns:
             Dictionary with comparison metrics
         """
-        v1 = self.db.query(RiskMatrixVersion).filter(
-            RiskMatrixVersion.id == version_id_1
-        ).first()
-        v2 = self.db.query(RiskMatrixVersion).filter(
-            RiskMatrixVersion.id == version_id_2
-        ).first()
+        versions = {
+            v.id: v for v in self.db.query(RiskMatrixVersion).filter(
+                RiskMatrixVersion.id.in_((version_id_1, version_id_2))
+            )
+        }
+        v1 = versions.get(version_id_1)
+        v2 = versions.get(version_id_2)
 
         if not v1 or not v2:
             raise ValueError("One or both versions not found")
 
-        # Calculate weight differences
-        weight_diff = {}
-        for cat in self.RISK_CATEGORIES:
-            w1 = getattr(v1, f"{cat}_weight")
-            w2 = getattr(v2, f"{cat}_weight")
-            weight_diff[cat] = {
-                "v1": w1,
-                "v2": w2,
-                "diff": w2 - w1,
-                "pct_change": ((w2 - w1) / w1 * 100) if w1 > 0 else 0
-            }
+        # Calculate weight differences for all categories at once
+        w1, w2 = np.array([self._weights_of(v1), self._weights_of(v2)], dtype=np.float64)
+        diff = w2 - w1
+        pct_change = np.divide(diff * 100, w1, out=np.zeros_like(diff), where=w1 > 0)
+
+        weight_diff = {
+            cat: {"v1": a, "v2": b, "diff": d, "pct_change": p}
+            for cat, a, b, d, p in zip(
+                self.RISK_CATEGORIES, w1.tolist(), w2.tolist(), diff.tolist(), pct_change.tolist()
+            )
+        }
 
         return {
             "version_1": {
@@ -3,11 +3,15 @@ Risk Scoring Service - Applies risk weights to compute composite scores.
 
 Uses the currently active risk matrix version to calculate weighted risk scores.
 """
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, Literal, Optional, List, Mapping, Tuple, get_args
+from datetime import datetime, timedelta, timezone
 import logging
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from operator import attrgetter
+import numpy as np
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, and_, case, select, update
 
 from src.db.models import (
     Supplier, RiskAssessment, RiskMatrixVersion,
@@ -16,6 +20,13 @@ from src.db.models import (
 
 logger = logging.getLogger(__name__)
 
+# Read-only weights (and their vectors) per risk matrix version id, built once
+# per process; version weights are never edited after creation
+_weights_by_version: Dict[int, Tuple[Mapping[str, float], np.ndarray]] = {}
+
+# Periods get_risk_trend can average over (PostgreSQL date_trunc units)
+TrendBucket = Literal["hour", "day", "week", "month"]
+
 
 class RiskScoringService:
     """
@@ -27,39 +38,93 @@ class RiskScoringService:
         "operational", "pricing", "social", "performance"
     ]
 
+    # Score keys/attribute names, built once in RISK_CATEGORIES order
+    SCORE_KEYS = tuple(f"{cat}_score" for cat in RISK_CATEGORIES)
+
+    # Equal weights used when no risk matrix version is active
+    DEFAULT_WEIGHTS = MappingProxyType(dict.fromkeys(RISK_CATEGORIES, 1.0 / len(RISK_CATEGORIES)))
+    _DEFAULT_WEIGHTS_ARRAY = np.full(len(RISK_CATEGORIES), 1.0 / len(RISK_CATEGORIES))
+    _DEFAULT_WEIGHTS_ARRAY.flags.writeable = False
+
+    # Composite score thresholds and the alert raised at or above each one;
+    # a score's severity is ALERT_SEVERITIES[bisect_right(ALERT_THRESHOLDS, score)]
+    ALERT_THRESHOLDS = (60.0, 80.0)
+    ALERT_SEVERITIES = (None, AlertSeverity.WARNING, AlertSeverity.CRITICAL)
+
+    # Periods get_risk_trend can average over, as a tuple for membership checks
+    TREND_BUCKETS = get_args(TrendBucket)
+
+    # Reads an assessment's category scores in RISK_CATEGORIES order
+    _scores_of = staticmethod(attrgetter(*SCORE_KEYS))
+
     def __init__(self, db: Session):
         self.db = db
+        # Active version and its weights, loaded once per service instance
+        self._active_version_cache: Optional[RiskMatrixVersion] = None
+        self._weights_cache: Optional[Mapping[str, float]] = None
+        self._weights_array: Optional[np.ndarray] = None
 
-    def get_active_weights(self) -> Dict[str, float]:
+    def get_active_weights(self) -> Mapping[str, float]:
         """
         Get the currently active risk weights.
 
+        The active version is queried on first use and cached on this
+        instance; call invalidate_weights_cache() after activating a new one.
+
         Returns:
             Dictionary mapping risk category to weight
         """
+        if self._weights_cache is not None:
+            return self._weights_cache
+
         active_version = self.db.query(RiskMatrixVersion).filter(
             RiskMatrixVersion.is_active == True
         ).first()
+        self._active_version_cache = active_version
 
         if not active_version:
             # Return default equal weights if no active version
             logger.warning("No active risk matrix version found. Using equal weights.")
-            return {cat: 1.0 / len(self.RISK_CATEGORIES) for cat in self.RISK_CATEGORIES}
-
-        weights = {
-            "financial": active_version.financial_weight,
-            "legal": active_version.legal_weight,
-            "esg": active_version.esg_weight,
-            "geopolitical": active_version.geopolitical_weight,
-            "operational": active_version.operational_weight,
-            "pricing": active_version.pricing_weight,
-            "social": active_version.social_weight,
-            "performance": active_version.performance_weight,
-        }
-
-        logger.debug(f"Using weights from version: {active_version.version}")
+            weights, weights_array = self.DEFAULT_WEIGHTS, self._DEFAULT_WEIGHTS_ARRAY
+        else:
+            cached = _weights_by_version.get(active_version.id)
+            if cached is None:
+                weights = MappingProxyType({
+                    "financial": active_version.financial_weight,
+                    "legal": active_version.legal_weight,
+                    "esg": active_version.esg_weight,
+                    "geopolitical": active_version.geopolitical_weight,
+                    "operational": active_version.operational_weight,
+                    "pricing": active_version.pricing_weight,
+                    "social": active_version.social_weight,
+                    "performance": active_version.performance_weight,
+                })
+                weights_array = self._weight_vector(weights)
+                weights_array.flags.writeable = False
+                cached = _weights_by_version[active_version.id] = (weights, weights_array)
+            weights, weights_array = cached
+            logger.debug(f"Using weights from version: {active_version.version}")
+
+        self._weights_cache = weights
+        self._weights_array = weights_array
         return weights
 
+    def invalidate_weights_cache(self):
+        """Drop the cached active version and weights so the next call re-queries them."""
+        self._active_version_cache = None
+        self._weights_cache = None
+        self._weights_array = None
+
+    def _get_active_version(self) -> Optional[RiskMatrixVersion]:
+        """Get the active risk matrix version, sharing the weights cache."""
+        self.get_active_weights()
+        return self._active_version_cache
+
+    def _get_active_weight_vector(self) -> Tuple[np.ndarray, Optional[RiskMatrixVersion]]:
+        """Get the active weight vector and the version it came from, sharing the weights cache."""
+        self.get_active_weights()
+        return self._weights_array, self._active_version_cache
+
     def compute_composite_score(
         self,
         category_scores: Dict[str, float],
@@ -76,15 +141,25 @@ class RiskScoringService:
             Composite score (0-100)
         """
         if weights is None:
-            weights = self.get_active_weights()
+            weight_vector, _ = self._get_active_weight_vector()
+        else:
+            weight_vector = self._weight_vector(weights)
+
+        score_vector = np.fromiter(
+            (category_scores.get(key, 0.0) for key in self.SCORE_KEYS),
+            dtype=np.float64,
+            count=len(self.RISK_CATEGORIES)
+        )
 
-        composite_score = 0.0
-        for category in self.RISK_CATEGORIES:
-            score = category_scores.get(f"{category}_score", 0.0)
-            weight = weights.get(category, 0.0)
-            composite_score += score * weight
+        return round(float(score_vector @ weight_vector), 2)
 
-        return round(composite_score, 2)
+    def _weight_vector(self, weights: Mapping[str, float]) -> np.ndarray:
+        """Order a category -> weight mapping as a vector aligned with RISK_CATEGORIES."""
+        return np.fromiter(
+            (weights.get(category, 0.0) for category in self.RISK_CATEGORIES),
+            dtype=np.float64,
+            count=len(self.RISK_CATEGORIES)
+        )
 
     def create_risk_assessment(
         self,
@@ -92,10 +167,10 @@ class RiskScoringService:
         category_scores: Dict[str, float],
         contract_id: Optional[int] = None,
         confidence_level: Optional[float] = None,
-        recommendation: Optional[str] = None,
         recommendation_rationale: Optional[str] = None,
         risk_factors: Optional[Dict] = None,
-        agent_type: Optional[str] = None
+        agent_type: Optional[str] = None,
+        supplier: Optional[Supplier] = None
     ) -> RiskAssessment:
         """
         Create a new risk assessment with computed composite score.
@@ -105,30 +180,20 @@ class RiskScoringService:
             category_scores: Dictionary with individual risk scores
             contract_id: Optional contract ID
             confidence_level: Confidence level (0-1)
-            recommendation: "Proceed", "Negotiate", or "Replace"
             recommendation_rationale: Explanation for recommendation
             risk_factors: Detailed risk factors
             agent_type: Type of agent that created this assessment
+            supplier: Supplier row, if the caller already has it loaded (used for alerts)
+
+        The recommendation ("Proceed", "Negotiate", "Replace") is a generated
+        column computed by the database from composite_score.
 
         Returns:
             Created RiskAssessment object
         """
         # Get active weights and version
-        active_version = self.db.query(RiskMatrixVersion).filter(
-            RiskMatrixVersion.is_active == True
-        ).first()
-
-        weights = self.get_active_weights()
-        composite_score = self.compute_composite_score(category_scores, weights)
-
-        # Determine recommendation if not provided
-        if recommendation is None:
-            if composite_score < 40:
-                recommendation = "Proceed"
-            elif composite_score < 70:
-                recommendation = "Negotiate"
-            else:
-                recommendation = "Replace"
+        active_version = self._get_active_version()
+        composite_score = self.compute_composite_score(category_scores)
 
         # Create assessment
         assessment = RiskAssessment(
@@ -147,28 +212,35 @@ class RiskScoringService:
             risk_matrix_version=active_version.version if active_version else "default",
             assessed_by_agent=True,
             agent_type=agent_type,
-            recommendation=recommendation,
             recommendation_rationale=recommendation_rationale,
             risk_factors=risk_factors,
         )
 
+        # Flush to get the assessment id, then commit it together with any alert
         self.db.add(assessment)
+        self.db.flush()
+
+        # Generate alerts if score is critical
+        severity = self.ALERT_SEVERITIES[bisect_right(self.ALERT_THRESHOLDS, composite_score)]
+        if severity is not None:
+            self._create_risk_alert(assessment, severity, supplier)
+
         self.db.commit()
-        self.db.refresh(assessment)
 
         logger.info(f"Created risk assessment for supplier {supplier_id}: {composite_score:.2f}")
 
-        # Generate alerts if score is critical
-        if composite_score >= 80:
-            self._create_risk_alert(assessment, AlertSeverity.CRITICAL)
-        elif composite_score >= 60:
-            self._create_risk_alert(assessment, AlertSeverity.WARNING)
-
         return assessment
 
-    def _create_risk_alert(self, assessment: RiskAssessment, severity: AlertSeverity):
-        """Create an alert for high risk assessment."""
-        supplier = self.db.query(Supplier).filter(Supplier.id == assessment.supplier_id).first()
+    def _create_risk_alert(
+        self,
+        assessment: RiskAssessment,
+        severity: AlertSeverity,
+        supplier: Optional[Supplier] = None
+    ):
+        """Add an alert for a high risk assessment; the caller commits it."""
+        if supplier is None:
+            # Served from the session's identity map when already loaded
+            supplier = self.db.get(Supplier, assessment.supplier_id)
 
         if not supplier:
             return
@@ -191,9 +263,69 @@ class RiskScoringService:
         )
 
         self.db.add(alert)
-        self.db.commit()
         logger.info(f"Created {severity.value} alert for supplier {supplier.name}")
 
+    def rescore_assessments(
+        self,
+        supplier_ids: Optional[List[int]] = None,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        Recompute composite scores with the active weights, e.g. after a new
+        risk matrix version is activated.
+
+        Note: this rewrites history. Every matched assessment, including past
+        ones, gets the new composite score and its risk_matrix_version is set
+        to the active version, so the record of which weights produced the
+        original score is lost.
+
+        Rows are read and updated in primary-key order, one batch per
+        transaction, so memory and transaction size stay bounded.
+
+        Args:
+            supplier_ids: Only rescore these suppliers' assessments (default: all)
+            batch_size: Assessments read, scored and updated per transaction
+
+        Returns:
+            Number of assessments rescored
+        """
+        weights_array, active_version = self._get_active_weight_vector()
+        version = active_version.version if active_version else "default"
+
+        stmt = select(RiskAssessment.id, *(getattr(RiskAssessment, key) for key in self.SCORE_KEYS))
+        if supplier_ids is not None:
+            stmt = stmt.where(RiskAssessment.supplier_id.in_(supplier_ids))
+        stmt = stmt.order_by(RiskAssessment.id).limit(batch_size)
+
+        rescored = 0
+        last_id = None
+        while True:
+            batch_stmt = stmt if last_id is None else stmt.where(RiskAssessment.id > last_id)
+            rows = self.db.execute(batch_stmt).all()
+            if not rows:
+                break
+
+            # One (n, 8) score matrix times the weight vector scores the whole batch
+            ids = [row.id for row in rows]
+            score_matrix = np.array([row[1:] for row in rows], dtype=np.float64)
+            composite_scores = np.round(score_matrix @ weights_array, 2).tolist()
+
+            # Bulk UPDATE by primary key; recommendation is regenerated by the database
+            self.db.execute(
+                update(RiskAssessment),
+                [
+                    {"id": assessment_id, "composite_score": score, "risk_matrix_version": version}
+                    for assessment_id, score in zip(ids, composite_scores)
+                ]
+            )
+            self.db.commit()
+
+            rescored += len(rows)
+            last_id = ids[-1]
+
+        logger.info(f"Rescored {rescored} risk assessments with version {version}")
+        return rescored
+
     def get_latest_assessment(self, supplier_id: int) -> Optional[RiskAssessment]:
         """Get the most recent risk assessment for a supplier."""
         return (
@@ -206,39 +338,60 @@ class RiskScoringService:
     def get_risk_trend(
         self,
         supplier_id: int,
-        days: int = 90
+        days: int = 90,
+        bucket: Optional[TrendBucket] = None
     ) -> List[Dict]:
         """
         Get risk score trend over time for a supplier.
 
+        Bucketing uses date_trunc, so it only works on PostgreSQL.
+
         Args:
             supplier_id: Supplier ID
             days: Number of days to look back
+            bucket: Optional period ("hour", "day", "week", "month") to average
+                assessments over in the database; returns every assessment if omitted
 
         Returns:
             List of {date, composite_score} dictionaries
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
+        if bucket is not None and bucket not in self.TREND_BUCKETS:
+            raise ValueError(f"Unsupported trend bucket: {bucket}")
+
+        # Timezone-aware UTC: no local zone lookup, unambiguous against timestamptz
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+
+        if bucket is None:
+            # Only the charted columns are fetched, as plain row tuples
+            date_column = RiskAssessment.assessed_at
+            columns = (date_column, RiskAssessment.composite_score, RiskAssessment.confidence_level)
+        else:
+            # Downsample in SQL: one averaged row per period
+            date_column = func.date_trunc(bucket, RiskAssessment.assessed_at).label("period")
+            columns = (
+                date_column,
+                func.avg(RiskAssessment.composite_score),
+                func.avg(RiskAssessment.confidence_level)
+            )
 
-        assessments = (
-            self.db.query(RiskAssessment)
-            .filter(
-                and_(
-                    RiskAssessment.supplier_id == supplier_id,
-                    RiskAssessment.assessed_at >= cutoff_date
-                )
+        query = self.db.query(*columns).filter(
+            and_(
+                RiskAssessment.supplier_id == supplier_id,
+                RiskAssessment.assessed_at >= cutoff_date
             )
-            .order_by(RiskAssessment.assessed_at.asc())
-            .all()
         )
+        if bucket is not None:
+            query = query.group_by(date_column)
+
+        rows = query.order_by(date_column.asc()).all()
 
         return [
             {
-                "date": a.assessed_at.isoformat(),
-                "composite_score": a.composite_score,
-                "confidence_level": a.confidence_level,
+                "date": assessed_at.isoformat(),
+                "composite_score": composite_score,
+                "confidence_level": confidence_level,
             }
-            for a in assessments
+            for assessed_at, composite_score, confidence_level in rows
         ]
 
     def get_category_breakdown(self, supplier_id: int) -> Optional[Dict]:
@@ -256,8 +409,7 @@ class RiskScoringService:
         weights = self.get_active_weights()
 
         breakdown = {}
-        for category in self.RISK_CATEGORIES:
-            score = getattr(assessment, f"{category}_score")
+        for category, score in zip(self.RISK_CATEGORIES, self._scores_of(assessment)):
             weight = weights.get(category, 0.0)
             weighted_contribution = score * weight
 
@@ -287,24 +439,39 @@ class RiskScoringService:
         Returns:
             List of supplier risk comparisons
         """
-        results = []
-
-        for supplier_id in supplier_ids:
-            supplier = self.db.query(Supplier).filter(Supplier.id == supplier_id).first()
-            assessment = self.get_latest_assessment(supplier_id)
-
-            if supplier and assessment:
-                results.append({
-                    "supplier_id": supplier.id,
-                    "supplier_name": supplier.name,
-                    "composite_score": assessment.composite_score,
-                    "recommendation": assessment.recommendation,
-                    "assessed_at": assessment.assessed_at.isoformat(),
-                    "category_scores": {
-                        cat: getattr(assessment, f"{cat}_score")
-                        for cat in self.RISK_CATEGORIES
-                    }
-                })
+        # Rank each supplier's assessments newest first and keep rank 1, so
+        # every supplier and its latest assessment come back in one query
+        ranked = (
+            select(
+                RiskAssessment,
+                func.row_number().over(
+                    partition_by=RiskAssessment.supplier_id,
+                    order_by=RiskAssessment.assessed_at.desc()
+                ).label("rn")
+            )
+            .where(RiskAssessment.supplier_id.in_(supplier_ids))
+            .subquery()
+        )
+        latest = aliased(RiskAssessment, ranked)
+
+        rows = (
+            self.db.query(Supplier.id, Supplier.name, latest)
+            .join(latest, Supplier.id == latest.supplier_id)
+            .filter(ranked.c.rn == 1)
+            .all()
+        )
+
+        results = [
+            {
+                "supplier_id": supplier_id,
+                "supplier_name": supplier_name,
+                "composite_score": assessment.composite_score,
+                "recommendation": assessment.recommendation,
+                "assessed_at": assessment.assessed_at.isoformat(),
+                "category_scores": dict(zip(self.RISK_CATEGORIES, self._scores_of(assessment)))
+            }
+            for supplier_id, supplier_name, assessment in rows
+        ]
 
         # Sort by composite score (highest risk first)
         results.sort(key=lambda x: x["composite_score"], reverse=True)
@@ -328,8 +495,29 @@ class RiskScoringService:
             .subquery()
         )
 
-        assessments = (
-            self.db.query(RiskAssessment)
+        # Aggregate the latest scores in the database so a single row of
+        # statistics comes back instead of every assessment
+        score = RiskAssessment.composite_score
+
+        def count_where(condition):
+            return func.sum(case((condition, 1), else_=0))
+
+        stats = (
+            self.db.query(
+                func.count().label("total"),
+                func.avg(score).label("average"),
+                func.min(score).label("min"),
+                func.max(score).label("max"),
+                count_where(score >= 70).label("high"),
+                count_where(and_(score >= 40, score < 70)).label("medium"),
+                count_where(score < 40).label("low"),
+                count_where(score < 20).label("band_0_20"),
+                count_where(and_(score >= 20, score < 40)).label("band_20_40"),
+                count_where(and_(score >= 40, score < 60)).label("band_40_60"),
+                count_where(and_(score >= 60, score < 80)).label("band_60_80"),
+                count_where(score >= 80).label("band_80_100"),
+            )
+            .select_from(RiskAssessment)
             .join(
                 latest_assessments,
                 and_(
@@ -337,10 +525,10 @@ class RiskScoringService:
                     RiskAssessment.assessed_at == latest_assessments.c.max_date
                 )
             )
-            .all()
+            .one()
         )
 
-        if not assessments:
+        if not stats.total:
             return {
                 "total_suppliers": 0,
                 "average_risk": 0.0,
@@ -349,21 +537,19 @@ class RiskScoringService:
                 "low_risk_count": 0,
             }
 
-        scores = [a.composite_score for a in assessments]
-
         return {
-            "total_suppliers": len(scores),
-            "average_risk": round(sum(scores) / len(scores), 2),
-            "min_risk": min(scores),
-            "max_risk": max(scores),
-            "high_risk_count": len([s for s in scores if s >= 70]),
-            "medium_risk_count": len([s for s in scores if 40 <= s < 70]),
-            "low_risk_count": len([s for s in scores if s < 40]),
+            "total_suppliers": stats.total,
+            "average_risk": round(float(stats.average), 2),
+            "min_risk": stats.min,
+            "max_risk": stats.max,
+            "high_risk_count": stats.high,
+            "medium_risk_count": stats.medium,
+            "low_risk_count": stats.low,
             "risk_distribution": {
-                "0-20": len([s for s in scores if s < 20]),
-                "20-40": len([s for s in scores if 20 <= s < 40]),
-                "40-60": len([s for s in scores if 40 <= s < 60]),
-                "60-80": len([s for s in scores if 60 <= s < 80]),
-                "80-100": len([s for s in scores if s >= 80]),
+                "0-20": stats.band_0_20,
+                "20-40": stats.band_20_40,
+                "40-60": stats.band_40_60,
+                "60-80": stats.band_60_80,
+                "80-100": stats.band_80_100,
             }
         }